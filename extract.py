@@ -1,13 +1,23 @@
 import pandas as pd
-import pdfplumber
+import fitz
+import ahocorasick
 import re
 import os
 import csv
+import logging
+import concurrent.futures
+from collections import defaultdict
 import numpy as np
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
+logger = logging.getLogger(__name__)
+
+# Also save the unformatted standardized data next to the formatted Excel
+WRITE_RAW = False
+
 def read_keywords_from_csv(csv_path):
     """Read keywords from a CSV file"""
     keywords = []
@@ -23,109 +33,117 @@ def read_keywords_from_csv(csv_path):
         print(f"Error reading CSV file: {e}")
         return []
 
+def build_keyword_automaton(keywords):
+    """Build an Aho-Corasick automaton matching the lowercased keywords"""
+    automaton = ahocorasick.Automaton()
+    for rank, keyword in enumerate(keywords):
+        if keyword:
+            # Keep the list position so matches can be reported in keyword order
+            automaton.add_word(keyword.lower(), (rank, keyword))
+    automaton.make_automaton()
+    return automaton
+
 def extract_keywords_from_pdf(pdf_path, keywords):
     """Find keywords in PDF and create a mapping of keywords to page numbers"""
-    keyword_pages = {}
+    keyword_pages = defaultdict(list)
     
     print(f"Processing PDF: {pdf_path}")
     print(f"Searching for keywords...")
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages):
+    # Build the automaton once so each page is scanned in a single pass
+    automaton = build_keyword_automaton(keywords)
+    
+    with fitz.open(pdf_path) as doc:
+        for i in range(doc.page_count):
             page_num = i + 1
             try:
-                text = page.extract_text()
-                if text:
-                    for keyword in keywords:
-                        if keyword.lower() in text.lower():
-                            if keyword not in keyword_pages:
-                                keyword_pages[keyword] = []
-                            keyword_pages[keyword].append(page_num)
-                            print(f"Found keyword '{keyword}' on page {page_num}")
+                text = doc.load_page(i).get_text("text")
+                if text and len(automaton) > 0:
+                    # The set holds each keyword once per page, however often it occurs
+                    found_on_page = {match for _, match in automaton.iter(text.lower())}
+                    for _, keyword in sorted(found_on_page):
+                        keyword_pages[keyword].append(page_num)
+                        logger.debug("Found keyword '%s' on page %d", keyword, page_num)
             except Exception as e:
                 print(f"Error on page {page_num}: {e}")
     
-    return keyword_pages
+    return dict(keyword_pages)
 
 def create_standardized_data(keyword_pages, company_name="Philips"):
     """Create standardized data from keyword to page mapping"""
-    data = []
-    
-    for keyword, pages in keyword_pages.items():
-        entry = {
-            'name': company_name,
-            'category': 'DR',
-            'variable': keyword,
-            'value': 1,
-        }
-        
-        # Add page references (up to 5)
-        for i, page in enumerate(pages[:5]):
-            entry[f'Page_ref{i+1}'] = page
-        
-        data.append(entry)
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    
-    # Ensure all Page_ref columns exist (up to 5)
-    for i in range(1, 6):
-        col_name = f'Page_ref{i}'
-        if col_name not in df.columns:
-            df[col_name] = ''
+    # Fill a fixed-width matrix of page references (up to 5), blank where missing
+    pages_matrix = np.full((len(keyword_pages), 5), '', dtype=object)
+    for r, pages in enumerate(keyword_pages.values()):
+        pages_matrix[r, :min(5, len(pages))] = pages[:5]
+    
+    # Create DataFrame in one shot with the full schema
+    df = pd.DataFrame({
+        'name': company_name,
+        'category': 'DR',
+        'variable': list(keyword_pages),
+        'value': 1,
+        **{f'Page_ref{i+1}': pages_matrix[:, i] for i in range(5)}
+    })
     
     return df
 
 def create_formatted_excel(df, output_path):
     """Create a formatted Excel file in the style shown in the example"""
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "DR Data"
-    
-    # Add title
-    ws.merge_cells('A1:G1')
-    title_cell = ws['A1']
-    title_cell.value = "How my ideal table looks like..."
-    title_cell.font = Font(name='Arial', size=24, bold=True, color="9C0006")
-    title_cell.alignment = Alignment(horizontal='left', vertical='center')
-    
-    # Set row height for title
-    ws.row_dimensions[1].height = 50
+    # Write-only mode streams rows to disk instead of keeping every cell in memory
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("DR Data")
     
     # Define header row
     headers = ['name', 'category', 'variable', 'value', 'Page_ref1', 'Page_ref2', 'Page_ref3', 'Page_ref4', 'Page_ref5']
-    
-    # Add header row
     header_row = 3
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws.cell(row=header_row, column=col_idx)
-        cell.value = header
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='left')
-        cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-    
-    # Add borders to header
+    additional_col = len(headers) + 2
+    
+    # Shared styles, built once and reused for every cell
+    title_font = Font(name='Arial', size=24, bold=True, color="9C0006")
+    title_alignment = Alignment(horizontal='left', vertical='center')
+    header_font = Font(bold=True)
+    header_alignment = Alignment(horizontal='left')
+    header_fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+    additional_title_font = Font(name='Arial', size=20, bold=True)
+    bullet_font = Font(name='Arial', size=14)
     thin_border = Border(left=Side(style='thin'), 
                        right=Side(style='thin'), 
                        top=Side(style='thin'), 
                        bottom=Side(style='thin'))
     
+    # Column widths and row heights must be set before any rows are written
     for col_idx in range(1, len(headers) + 1):
-        ws.cell(row=header_row, column=col_idx).border = thin_border
+        col_letter = get_column_letter(col_idx)
+        ws.column_dimensions[col_letter].width = 15
     
-    # Add data rows
-    for row_idx, (_, row_data) in enumerate(df.iterrows(), 1):
-        for col_idx, header in enumerate(headers, 1):
-            if header in row_data:
-                ws.cell(row=header_row + row_idx, column=col_idx).value = row_data[header]
-                ws.cell(row=header_row + row_idx, column=col_idx).border = thin_border
+    # Adjust width for additional items column
+    ws.column_dimensions[get_column_letter(additional_col)].width = 35
     
-    # Add "Additional data items" section
-    additional_row = header_row
-    ws.cell(row=additional_row, column=len(headers) + 2).value = "Additional data items"
-    ws.cell(row=additional_row, column=len(headers) + 2).font = Font(name='Arial', size=20, bold=True)
+    # Set row height for title
+    ws.row_dimensions[1].height = 50
     
-    # Add bullet points for additional items
+    # Add title
+    ws.merged_cells.add('A1:G1')
+    title_cell = WriteOnlyCell(ws, value="How my ideal table looks like...")
+    title_cell.font = title_font
+    title_cell.alignment = title_alignment
+    ws.append([title_cell])
+    ws.append([])
+    
+    # Add header row, with the "Additional data items" section title next to it
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        cell.alignment = header_alignment
+        cell.fill = header_fill
+        cell.border = thin_border
+        header_cells.append(cell)
+    additional_title = WriteOnlyCell(ws, value="Additional data items")
+    additional_title.font = additional_title_font
+    ws.append(header_cells + [None, additional_title])
+    
+    # Bullet points for additional items, keyed by their offset below the header row
     additional_items = [
         "Assurance level",
         "Results of materiality assessment (DMA)",
@@ -133,25 +151,70 @@ def create_formatted_excel(df, output_path):
         "Any other additional items you can standardize",
         "Carbon Offset E1-7"
     ]
-    
-    for idx, item in enumerate(additional_items):
-        bullet_row = additional_row + idx + 2
-        ws.cell(row=bullet_row, column=len(headers) + 2).value = "• " + item
-        ws.cell(row=bullet_row, column=len(headers) + 2).font = Font(name='Arial', size=14)
-    
-    # Auto-adjust column widths
-    for col_idx in range(1, len(headers) + 1):
-        col_letter = get_column_letter(col_idx)
-        ws.column_dimensions[col_letter].width = 15
-    
-    # Adjust width for additional items column
-    ws.column_dimensions[get_column_letter(len(headers) + 2)].width = 35
+    bullets = {idx + 2: "• " + item for idx, item in enumerate(additional_items)}
+    
+    def bordered_cell(value):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.border = thin_border
+        return cell
+    
+    # Add data rows, continuing past the data if the bullet list is longer.
+    # Columns are read as NumPy arrays once; headers missing from df stay empty.
+    col_arrays = [df[header].to_numpy() if header in df.columns else None for header in headers]
+    for offset in range(1, max(len(df), max(bullets)) + 1):
+        r = offset - 1
+        if r < len(df):
+            row_cells = [bordered_cell(arr[r]) if arr is not None else None for arr in col_arrays]
+        else:
+            row_cells = [None] * len(headers)
+        if offset in bullets:
+            bullet_cell = WriteOnlyCell(ws, value=bullets[offset])
+            bullet_cell.font = bullet_font
+            row_cells += [None, bullet_cell]
+        ws.append(row_cells)
     
     # Save the workbook
     wb.save(output_path)
     print(f"Formatted Excel file created at: {output_path}")
 
+# Per-worker state, set once by init_worker so the keyword list is not re-read per PDF
+_worker_keywords = []
+_worker_output_directory = 'output'
+
+def init_worker(keywords, output_directory):
+    """Store the shared keyword list and output directory in a worker process"""
+    global _worker_keywords, _worker_output_directory
+    _worker_keywords = keywords
+    _worker_output_directory = output_directory
+
+def process_one_pdf(pdf_path):
+    """Extract keywords from one PDF and write its Excel outputs"""
+    pdf_file = os.path.basename(pdf_path)
+    base_name = os.path.splitext(pdf_file)[0]
+    
+    # Extract keywords and find their pages
+    keyword_pages = extract_keywords_from_pdf(pdf_path, _worker_keywords)
+    
+    if keyword_pages:
+        # Create standardized data
+        standardized_data = create_standardized_data(keyword_pages)
+        
+        # Create intermediate file (optional), as CSV since it is only a raw dump
+        if WRITE_RAW:
+            intermediate_csv = os.path.join(_worker_output_directory, f"{base_name}_tables_raw.csv")
+            standardized_data.to_csv(intermediate_csv, index=False)
+            print(f"Raw data saved to {intermediate_csv}")
+        
+        # Create formatted Excel
+        output_excel = os.path.join(_worker_output_directory, f"{base_name}_tables_formatted.xlsx")
+        create_formatted_excel(standardized_data, output_excel)
+    else:
+        print(f"No keywords found in {pdf_file}.")
+
 def main():
+    # Per-match messages are logged at DEBUG; raise the level to see them
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # File paths
     csv_path = 'DR_list.csv'
     pdf_directory = 'pdfs'
@@ -167,29 +230,13 @@ def main():
         print("No keywords found or error reading CSV file.")
         return
     
-    # Process each PDF file in the directory
-    for pdf_file in os.listdir(pdf_directory):
-        if pdf_file.lower().endswith('.pdf'):
-            pdf_path = os.path.join(pdf_directory, pdf_file)
-            base_name = os.path.splitext(pdf_file)[0]
-            
-            # Extract keywords and find their pages
-            keyword_pages = extract_keywords_from_pdf(pdf_path, keywords)
-            
-            if keyword_pages:
-                # Create standardized data
-                standardized_data = create_standardized_data(keyword_pages)
-                
-                # Create intermediate file (optional)
-                intermediate_excel = os.path.join(output_directory, f"{base_name}_tables_raw.xlsx")
-                standardized_data.to_excel(intermediate_excel, index=False)
-                print(f"Raw data saved to {intermediate_excel}")
-                
-                # Create formatted Excel
-                output_excel = os.path.join(output_directory, f"{base_name}_tables_formatted.xlsx")
-                create_formatted_excel(standardized_data, output_excel)
-            else:
-                print(f"No keywords found in {pdf_file}.")
+    # Process the PDF files in the directory in parallel, one worker per PDF
+    pdf_paths = [os.path.join(pdf_directory, f) for f in os.listdir(pdf_directory)
+                 if f.lower().endswith('.pdf')]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                                initializer=init_worker,
+                                                initargs=(keywords, output_directory)) as executor:
+        list(executor.map(process_one_pdf, pdf_paths))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
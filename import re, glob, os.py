@@ -1,33 +1,48 @@
 import re
-import pdfplumber
+import fitz
 import camelot
+import ahocorasick
 import pandas as pd
 import glob
 import os
+import tempfile
+import logging
 import sys # Import the sys module to access command-line arguments
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 print("Script started: Importing modules...") # Diagnostic print
 
+logger = logging.getLogger(__name__)
+
 # regex to catch e.g. "BP-1", "GOV-3", "IRO-2", etc.
 ESRS_CODE_RE = re.compile(r"\b[A-Z]{2,4}-\d+\b")
 
-# Regexes for specific reference types
-SECTION_RE = re.compile(r"(Section\s+[\d\.]+|\b\d+(\.\d+)+\b)", re.IGNORECASE) # Matches "Section X.Y.Z" or just "X.Y.Z"
-PARAGRAPH_RE = re.compile(r"paragraph\s+\d+", re.IGNORECASE) # Matches "paragraph N"
-PAGE_RE = re.compile(r"page\s+\d+", re.IGNORECASE) # Matches "page N"
-STANDALONE_NUMBER_RE = re.compile(r"\b\d+\b") # Matches standalone numbers
+# Regex for the specific reference types, combined so each row is scanned once.
+# Alternatives are tried left to right, so section, paragraph and page references
+# consume their digits before the standalone number alternative can match them.
+# A dotted number right after "paragraph"/"page" (e.g. "page 3.1") is also a section reference.
+REFERENCE_RE = re.compile(
+    r"(?P<section>Section\s+[\d\.]+|\b\d+(?:\.\d+)+\b)" # Matches "Section X.Y.Z" or just "X.Y.Z"
+    r"|(?P<paragraph>(?P<paragraph_ref>paragraph\s+(?P<paragraph_num>\d+))(?P<paragraph_sub>(?:\.\d+)+\b)?)" # Matches "paragraph N"
+    r"|(?P<page>page\s+(?P<page_num>\d+)(?P<page_sub>(?:\.\d+)+\b)?)" # Matches "page N"
+    r"|(?P<num>\b\d+\b)", # Matches standalone numbers
+    re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+") # Matches runs of whitespace, used to normalize cells
 
 # Global variables to store the loaded DR list data
 esrs_disclosure_texts = []
 disclosure_to_code_mapping = {}
+disclosure_automaton = None # Aho-Corasick automaton over the lowercased disclosure texts
 
 # --- Function Definitions ---
 
 def load_dr_list(dr_list_path):
     """Loads the ESRS disclosure requirements from a CSV file."""
-    global esrs_disclosure_texts, disclosure_to_code_mapping
+    global esrs_disclosure_texts, disclosure_to_code_mapping, disclosure_automaton, page_automaton
     esrs_disclosure_texts = []
     disclosure_to_code_mapping = {}
+    disclosure_automaton = None
+    page_automaton = build_page_automaton([])
 
     if not os.path.exists(dr_list_path):
         print(f"Warning: DR list file not found at {dr_list_path}. Proceeding without using the DR list for matching.")
@@ -53,27 +68,31 @@ def load_dr_list(dr_list_path):
             'ESRS'
         ]
 
+        # Lowercase the candidate names once instead of on every comparison
+        potential_disclosure_cols_lower = [p_col.lower() for p_col in potential_disclosure_cols]
+        potential_esrs_code_cols_lower = [p_col.lower() for p_col in potential_esrs_code_cols]
+
         for col in dr_df.columns:
-            if disclosure_col is None and any(p_col.lower() in col.lower() for p_col in potential_disclosure_cols):
+            col_lower = str(col).lower()
+            if disclosure_col is None and any(p_col in col_lower for p_col in potential_disclosure_cols_lower):
                 disclosure_col = col
-            if esrs_code_col is None and any(p_col.lower() in col.lower() for p_col in potential_esrs_code_cols):
+            if esrs_code_col is None and any(p_col in col_lower for p_col in potential_esrs_code_cols_lower):
                  esrs_code_col = col
             if disclosure_col and esrs_code_col:
                 break # Found both necessary columns
 
         if disclosure_col and esrs_code_col:
             esrs_disclosure_texts = dr_df[disclosure_col].dropna().tolist()
-            # Create mapping from disclosure text to ESRS code
-            for index, row in dr_df.dropna(subset=[disclosure_col, esrs_code_col]).iterrows():
-                 disclosure_text = str(row[disclosure_col]).strip() # Ensure text is string and stripped
-                 esrs_code_cell = str(row[esrs_code_col]).strip() # Ensure cell is string and stripped
-                 # Extract the first ESRS code found in the ESRS code cell
-                 match = ESRS_CODE_RE.search(esrs_code_cell)
-                 if match:
-                     disclosure_to_code_mapping[disclosure_text] = match.group(0)
-                 # else:
-                 #     print(f"Warning: No ESRS code found for disclosure: '{disclosure_text}' in cell '{esrs_code_cell}'")
+            # Create mapping from disclosure text to ESRS code, column-wise rather than row by row
+            dr_rows = dr_df.dropna(subset=[disclosure_col, esrs_code_col])
+            disclosure_texts = dr_rows[disclosure_col].astype(str).str.strip() # Ensure text is string and stripped
+            # Extract the first ESRS code found in each ESRS code cell
+            esrs_codes = dr_rows[esrs_code_col].astype(str).str.strip().str.extract(f"({ESRS_CODE_RE.pattern})", expand=False)
+            has_code = esrs_codes.notna()
+            disclosure_to_code_mapping = dict(zip(disclosure_texts[has_code], esrs_codes[has_code]))
 
+            disclosure_automaton = build_disclosure_automaton(disclosure_to_code_mapping)
+            page_automaton = build_page_automaton(esrs_disclosure_texts)
 
             print(f"Successfully loaded {len(esrs_disclosure_texts)} disclosure texts from '{disclosure_col}' and mapped to ESRS codes from '{esrs_code_col}' in {dr_list_path}")
             # print(f"Mapping example: {list(disclosure_to_code_mapping.items())[:5]}") # Print a few examples of the mapping
@@ -90,12 +109,67 @@ def load_dr_list(dr_list_path):
         print("Proceeding without using the DR list for matching.")
 
 
-def extract_tables_on_page(pdf_path, page, flavor):
-    """Pull tables from a single page with Camelot flavor."""
+def build_disclosure_automaton(mapping):
+    """
+    Builds an Aho-Corasick automaton over the lowercased disclosure texts so a
+    row can be matched against the whole DR list in a single pass.
+    Each key carries a list of (rank, disclosure_text, esrs_code), where rank is
+    the position in the longest-first order used to break ties between matches.
+    """
+    if not mapping:
+        return None
+    payloads = {}
+    sorted_dr_texts = sorted(mapping.keys(), key=len, reverse=True)
+    for rank, dr_text in enumerate(sorted_dr_texts):
+        if dr_text:
+            payloads.setdefault(dr_text.lower(), []).append((rank, dr_text, mapping[dr_text]))
+    if not payloads:
+        return None
+    automaton = ahocorasick.Automaton()
+    for key, entries in payloads.items():
+        automaton.add_word(key, (len(key), entries))
+    automaton.make_automaton()
+    return automaton
+
+
+def build_page_automaton(dr_texts):
+    """
+    Builds an Aho-Corasick automaton over "esrs" and the lowercased disclosure
+    texts, so find_esrs_pages can classify a page with one walk over its text.
+    """
+    automaton = ahocorasick.Automaton()
+    automaton.add_word("esrs", "ESRS")
+    for dr_text in dr_texts:
+        dr_text_lower = str(dr_text).lower()
+        if dr_text_lower:
+            automaton.add_word(dr_text_lower, dr_text)
+    automaton.make_automaton()
+    return automaton
+
+
+# Until a DR list is loaded, pages are only matched on "ESRS"
+page_automaton = build_page_automaton([])
+
+
+def save_page_as_pdf(doc, page, directory):
+    """Write a single page (1-based) of an open PyMuPDF document to its own PDF file."""
+    page_pdf_path = os.path.join(directory, f"page_{page}.pdf")
+    with fitz.open() as page_doc:
+        page_doc.insert_pdf(doc, from_page=page - 1, to_page=page - 1)
+        page_doc.save(page_pdf_path)
+    return page_pdf_path
+
+
+def extract_tables_on_page(pdf_path, page, flavor, page_in_file=None):
+    """
+    Pull tables from a single page with Camelot flavor.
+    If pdf_path is an extract of the original PDF, page_in_file is the page to read
+    from it, while page is still the original page number used in messages.
+    """
     try:
         # Use suppress_stdout=True to reduce Camelot's verbose output
         tables = camelot.read_pdf(pdf_path,
-                                pages=str(page),
+                                pages=str(page_in_file or page),
                                 flavor=flavor,
                                 strip_text='\n',
                                 suppress_stdout=True)
@@ -110,30 +184,35 @@ def extract_tables_on_page(pdf_path, page, flavor):
 def find_esrs_pages(pdf_path):
     """
     Return list of pages (1-based) whose text contains 'ESRS' or any of the
-    loaded ESRS disclosure texts.
+    loaded ESRS disclosure texts, together with a dict mapping each of those
+    pages to its extracted text so later steps don't need to re-read the PDF.
     """
     pages = []
+    page_texts = {}
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for i, page in enumerate(pdf.pages, start=1):
-                text = (page.extract_text() or "")
-                # Check for the word ESRS (case-insensitive)
-                if "ESRS" in text.upper():
-                    if i not in pages: pages.append(i) # Avoid adding duplicate pages
-                    # continue # Don't continue, also check for specific texts on the same page
-
-                # If DR list is loaded, check for disclosure texts on the page
-                if esrs_disclosure_texts:
-                    # Simple substring check: see if any disclosure text is a substring of the page text
-                    # Fuzzy matching could be used here for better results if needed
-                    if any(dr_text.lower() in text.lower() for dr_text in esrs_disclosure_texts):
-                        if i not in pages: # Avoid adding duplicate pages
-                             pages.append(i)
+        with fitz.open(pdf_path) as doc:
+            for i in range(1, doc.page_count + 1):
+                text = doc.load_page(i - 1).get_text("text")
+                # Check for the word ESRS or, if the DR list is loaded, any disclosure text
+                # (case-insensitive). The first match from the automaton is enough.
+                # Fuzzy matching could be used here for better results if needed
+                if next(page_automaton.iter(text.lower()), None) is not None:
+                    pages.append(i)
+                    # Keep the text of selected pages for the table extraction step
+                    page_texts[i] = text
 
     except Exception as e:
         print(f"Error opening or reading PDF {pdf_path}: {e}")
-        return []
-    return pages
+        return [], {}
+    return pages, page_texts
+
+def page_may_contain_esrs_code(text):
+    """
+    Cheap pre-check on the already extracted page text: process_table_for_esrs only
+    keeps rows with an ESRS code, so pages without any code can skip Camelot.
+    Camelot joins wrapped cell lines, so codes broken across lines are checked too.
+    """
+    return bool(ESRS_CODE_RE.search(text) or ESRS_CODE_RE.search(text.replace("\n", "")))
 
 def process_table_for_esrs(df, page):
     """
@@ -143,14 +222,14 @@ def process_table_for_esrs(df, page):
     Returns a list of dictionaries, each representing an extracted entry.
     """
     extracted_data = []
-    df_processed = df.copy()
-
-    # Normalize whitespace in all cells
-    df_processed = df_processed.applymap(lambda x: re.sub(r"\s+", " ", str(x).strip()))
+    # Normalize whitespace in all cells in one pass over the flattened values,
+    # working on the raw array rather than a copied DataFrame
+    n_rows, n_cols = df.shape
+    cleaned = [WHITESPACE_RE.sub(" ", str(x).strip()) for x in df.to_numpy().ravel()]
 
     # --- Step 1: Process rows to find ESRS codes and match against DR list ---
-    for index, row in df_processed.iterrows():
-        row_text = " ".join([str(cell) for cell in row.tolist()]) # Get the full row text
+    for r in range(n_rows):
+        row_text = " ".join(cleaned[r * n_cols:(r + 1) * n_cols]) # Get the full row text
 
         found_esrs_code = None
         matched_disclosure_text = None
@@ -162,25 +241,25 @@ def process_table_for_esrs(df, page):
             found_esrs_code = esrs_code_match.group(0)
 
         # If DR list is loaded and we found an ESRS code, try to find a matching disclosure text
-        if esrs_disclosure_texts and found_esrs_code:
+        if esrs_disclosure_texts and found_esrs_code and disclosure_automaton is not None:
             # Look for a disclosure text in the row that corresponds to the found ESRS code
             # Simple substring match for now. Fuzzy matching could be better.
             best_match_text = None
             best_match_index = -1
-
-            # Iterate through the disclosure texts and find the best match (longest match found first)
-            # This helps with cases where one disclosure text is a substring of another
-            # Sort disclosure texts by length in descending order for better matching
-            sorted_dr_texts = sorted(disclosure_to_code_mapping.keys(), key=len, reverse=True)
-
-            for dr_text in sorted_dr_texts:
-                 # Ensure dr_text is a string before using .lower()
-                 if isinstance(dr_text, str) and disclosure_to_code_mapping.get(dr_text) == found_esrs_code and dr_text.lower() in row_text.lower():
-                     match_start_index = row_text.lower().find(dr_text.lower())
-                     # Check if this match is better (starts earlier or is longer)
-                     if match_start_index != -1 and (best_match_text is None or match_start_index < best_match_index or len(dr_text) > len(best_match_text)):
-                         best_match_text = dr_text
-                         best_match_index = match_start_index
+            best_match_key = None
+
+            # Walk the row once, collecting every disclosure text for this code that occurs in it.
+            # The earliest match wins; ties go to the longest text, as the longest-first scan did.
+            for end_index, (key_length, entries) in disclosure_automaton.iter(row_text.lower()):
+                match_start_index = end_index - key_length + 1
+                for rank, dr_text, esrs_code in entries:
+                    if esrs_code != found_esrs_code:
+                        continue
+                    match_key = (match_start_index, rank)
+                    if best_match_key is None or match_key < best_match_key:
+                        best_match_text = dr_text
+                        best_match_index = match_start_index
+                        best_match_key = match_key
 
             if best_match_text:
                 matched_disclosure_text = best_match_text
@@ -191,52 +270,30 @@ def process_table_for_esrs(df, page):
 
 
         # --- Step 2: Find and categorize references in the designated search text ---
-        section_refs = []
-        page_refs = []
-        paragraph_refs = []
-        other_refs = [] # For standalone numbers or other patterns
-
-        # Search for specific patterns in the reference_search_text
-        found_sections = SECTION_RE.findall(reference_search_text)
-        for sec_tuple in found_sections:
-            sec = sec_tuple[0] if isinstance(sec_tuple, tuple) else sec_tuple
-            sec = sec.strip()
-            if sec and sec not in section_refs:
-                section_refs.append(sec)
-
-        found_paragraphs = PARAGRAPH_RE.findall(reference_search_text)
-        for para in found_paragraphs:
-            para = para.strip()
-            if para and para not in paragraph_refs:
-                paragraph_refs.append(para)
-
-        found_pages = PAGE_RE.findall(reference_search_text)
-        for page_ref_str in found_pages:
-            page_ref_str = page_ref_str.strip()
-            # Extract just the number from "page N"
-            page_num_match = STANDALONE_NUMBER_RE.search(page_ref_str)
-            if page_num_match:
-                page_num = page_num_match.group(0)
-                if page_num and page_num not in page_refs: # Store just the number
-                    page_refs.append(page_num)
-
-
-        # Find standalone numbers in the reference_search_text
-        # Only consider standalone numbers if they are not part of a section, paragraph, or page pattern already found
-        found_numbers = STANDALONE_NUMBER_RE.findall(reference_search_text)
-        for num in found_numbers:
-             # Check if this number is already part of a more specific reference found
-             is_part_of_other_ref = False
-             for sec in section_refs:
-                 if num in sec: is_part_of_other_ref = True
-             for para in paragraph_refs:
-                 if num in para: is_part_of_other_ref = True
-             # Check against the original "page N" string, not just the extracted number
-             for page_ref_str in found_pages:
-                 if num in page_ref_str: is_part_of_other_ref = True
-
-             if not is_part_of_other_ref and num not in other_refs:
-                 other_refs.append(num)
+        # Insertion-ordered dicts act as ordered sets, so de-duplication is a hash lookup
+        # rather than a scan of everything collected so far
+        section_refs = {}
+        page_refs = {}
+        paragraph_refs = {}
+        other_refs = {} # For standalone numbers or other patterns
+
+        # Search for all reference patterns in the reference_search_text in a single pass.
+        # Standalone numbers only match where no section, paragraph, or page pattern did.
+        for ref_match in REFERENCE_RE.finditer(reference_search_text):
+            kind = ref_match.lastgroup
+            if kind == "section":
+                section_refs[ref_match.group("section")] = None
+            elif kind == "paragraph":
+                paragraph_refs[ref_match.group("paragraph_ref")] = None
+                if ref_match.group("paragraph_sub"):
+                    section_refs[ref_match.group("paragraph_num") + ref_match.group("paragraph_sub")] = None
+            elif kind == "page":
+                # Store just the number from "page N"
+                page_refs[ref_match.group("page_num")] = None
+                if ref_match.group("page_sub"):
+                    section_refs[ref_match.group("page_num") + ref_match.group("page_sub")] = None
+            else:
+                other_refs[ref_match.group("num")] = None
 
 
         # --- Step 3: Filtering Heuristic ---
@@ -269,8 +326,9 @@ def extract_esrs_tables(pdf_path, output_dir, output_csv="esrs_tables.csv"):
     Identifies pages mentioning ESRS or DR texts, extracts tables, and processes them
     to find ESRS codes and associated references using the loaded DR list.
     Saves the output CSV to the specified output_dir.
+    Returns the number of rows written, or None if nothing was extracted.
     """
-    esrs_pages = find_esrs_pages(pdf_path)
+    esrs_pages, page_texts = find_esrs_pages(pdf_path)
     if not esrs_pages:
         print(f"PDF {pdf_path}: No pages mentioning ESRS or DR texts found.")
         return None
@@ -279,35 +337,55 @@ def extract_esrs_tables(pdf_path, output_dir, output_csv="esrs_tables.csv"):
 
     all_extracted_data = []
 
-    for page in esrs_pages:
-        print(f"Processing page {page}...")
-        # Try both lattice and stream flavors
-        tables_lattice = extract_tables_on_page(pdf_path, page, "lattice")
-        tables_stream = extract_tables_on_page(pdf_path, page, "stream")
-
-        # Combine tables from both flavors into a single list
-        tables = []
-        if tables_lattice:
-            tables.extend(tables_lattice)
-        if tables_stream:
-            tables.extend(tables_stream)
-
-
-        if not tables:
-            print(f"  → No tables found on page {page}.")
-            continue
-
-        print(f"Found {len(tables)} tables on page {page}.")
-        for idx, tbl in enumerate(tables, start=1):
-            print(f"  → Processing table #{idx} on p.{page}...")
-            df = tbl.df
-            # Process the extracted table DataFrame
-            extracted_from_table = process_table_for_esrs(df, page)
-            if extracted_from_table:
-                print(f"    → Extracted {len(extracted_from_table)} ESRS entries from table #{idx}.")
-                all_extracted_data.extend(extracted_from_table)
+    with fitz.open(pdf_path) as doc, tempfile.TemporaryDirectory() as page_dir:
+        # A one-page extract written by PyMuPDF drops the source's encryption and
+        # permission flags, so encrypted reports are read from the original file
+        # and Camelot still refuses them when text extraction is not allowed
+        split_pages = not doc.metadata.get("encryption")
+        for page in esrs_pages:
+            # Reuse the text from the page scan to skip Camelot where no row could qualify
+            if not page_may_contain_esrs_code(page_texts.get(page, "")):
+                logger.debug("  → No ESRS codes on page %d, skipping table extraction.", page)
+                continue
+
+            logger.debug("Processing page %d...", page)
+            # Split the page out once so both Camelot flavors parse a one-page file
+            # instead of each re-reading the whole report
+            if split_pages:
+                page_pdf, page_in_file = save_page_as_pdf(doc, page, page_dir), 1
             else:
-                print(f"    → No relevant ESRS entries found in table #{idx}.")
+                page_pdf, page_in_file = pdf_path, None
+
+            # Try both lattice and stream flavors, running the two Camelot parses side by side.
+            # Only lattice renders the page, so the threads never use the renderer concurrently.
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                future_lattice = executor.submit(extract_tables_on_page, page_pdf, page, "lattice", page_in_file=page_in_file)
+                future_stream = executor.submit(extract_tables_on_page, page_pdf, page, "stream", page_in_file=page_in_file)
+                tables_lattice, tables_stream = future_lattice.result(), future_stream.result()
+
+            # Combine tables from both flavors into a single list
+            tables = []
+            if tables_lattice:
+                tables.extend(tables_lattice)
+            if tables_stream:
+                tables.extend(tables_stream)
+
+
+            if not tables:
+                logger.debug("  → No tables found on page %d.", page)
+                continue
+
+            logger.debug("Found %d tables on page %d.", len(tables), page)
+            for idx, tbl in enumerate(tables, start=1):
+                logger.debug("  → Processing table #%d on p.%d...", idx, page)
+                df = tbl.df
+                # Process the extracted table DataFrame
+                extracted_from_table = process_table_for_esrs(df, page)
+                if extracted_from_table:
+                    logger.debug("    → Extracted %d ESRS entries from table #%d.", len(extracted_from_table), idx)
+                    all_extracted_data.extend(extracted_from_table)
+                else:
+                    logger.debug("    → No relevant ESRS entries found in table #%d.", idx)
 
 
     if not all_extracted_data:
@@ -326,7 +404,8 @@ def extract_esrs_tables(pdf_path, output_dir, output_csv="esrs_tables.csv"):
     # Save the result to a CSV file
     result_df.to_csv(output_csv_path, index=False)
     print(f"✅ Extracted {len(result_df)} rows into {output_csv_path!r}")
-    return result_df
+    # Only the row count goes back to main, so workers do not pickle the whole table
+    return len(result_df)
 
 
 def main():
@@ -337,6 +416,9 @@ def main():
     Accepts an optional command-line argument for the output directory.
     Includes logic to create dummy directories and PDF if they don't exist.
     """
+    # Per-page and per-table progress is logged at DEBUG; raise the level to see it
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Define paths for pdfs directory and DR list file
     pdfs_dir = "pdfs"
     # Use the specific filename provided by the user
@@ -437,23 +519,45 @@ def main():
 
         # Process the selected files
         print(f"\nSelected {len(pdf_files_to_process)} file(s) for processing.")
-        for pdf_file in pdf_files_to_process:
+        existing_pdf_files = []
+        for pdf_file in dict.fromkeys(pdf_files_to_process): # Drop repeats so no two workers write the same CSV
             if not os.path.exists(pdf_file):
                 print(f"Error: File not found at {pdf_file}. Skipping.")
                 continue
-
-            print("\n── processing", pdf_file)
-            # Output CSV name includes _esrs to differentiate
-            output_csv_name = os.path.basename(pdf_file).replace(".pdf", "_esrs.csv")
-            # Call extract_esrs_tables with the determined output_dir
-            df = extract_esrs_tables(pdf_file, output_dir, output_csv=output_csv_name)
-            if df is not None:
-                # The saving message is now handled within extract_esrs_tables
-                pass
-            else:
-                print(f"  → No data saved for {pdf_file}\n")
+            existing_pdf_files.append(pdf_file)
+
+        if existing_pdf_files:
+            # Each PDF is independent, so run one per worker process. Workers re-load the DR list
+            # in the initializer because module globals are not inherited under the spawn start method.
+            with ProcessPoolExecutor(max_workers=min(8, len(existing_pdf_files)),
+                                     initializer=load_dr_list,
+                                     initargs=(dr_list_file,)) as executor:
+                futures = {}
+                for pdf_file in existing_pdf_files:
+                    print("── queued", pdf_file)
+                    # Output CSV name includes _esrs to differentiate
+                    output_csv_name = os.path.basename(pdf_file).replace(".pdf", "_esrs.csv")
+                    # Call extract_esrs_tables with the determined output_dir
+                    futures[executor.submit(extract_esrs_tables, pdf_file, output_dir, output_csv=output_csv_name)] = pdf_file
+
+                for future in as_completed(futures):
+                    pdf_file = futures[future]
+                    print("\n── processed", pdf_file)
+                    try:
+                        n_rows = future.result()
+                    except Exception as e:
+                        print(f"Error processing {pdf_file}: {e}")
+                        continue
+                    if n_rows is not None:
+                        # The saving message is now handled within extract_esrs_tables
+                        print(f"  → Finished {pdf_file}: {n_rows} rows")
+                    else:
+                        print(f"  → No data saved for {pdf_file}\n")
 
         # Ask if the user wants to process more files
         process_more = input("Process more files? (yes/no): ").strip().lower()
         if process_more != 'yes' and process_more != 'y':
             break # Exit the while loop
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,200 @@
 import re
 import pdfplumber
+import fitz
+import pypdfium2 as pdfium
 import camelot
 import pandas as pd
+import os
+import glob
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict
 
 # regex to catch e.g. "BP-1", "GOV-3", "IRO-2", etc.
 ESRS_CODE_RE = re.compile(r"\b[A-Z]{2,4}-\d+\b")
 
-def find_esrs_pages    (pdf_path):
-    """Return list of pages (1-based) whose text contains 'ESRS'."""
+# "ESRS" in any case, searched without making an upper-cased copy of the page text
+ESRS_MENTION_RE = re.compile(r"ESRS", re.IGNORECASE)
+
+# runs of whitespace, collapsed to a single space in table cells
+WHITESPACE_RE = re.compile(r"\s+")
+
+def table_codes(df):
+    """Return the sorted ESRS codes found in a table's cells, [] if none."""
+    # codes never contain whitespace, so the raw cells give the same matches
+    # as the normalized ones; joining the raveled object array in one call is
+    # far cheaper than a per-row df.agg(" ".join, axis=1)
+    body_text = " ".join(df.to_numpy().ravel())
+    if not ESRS_CODE_RE.search(body_text):
+        return []
+    return sorted(set(ESRS_CODE_RE.findall(body_text)))
+
+# ESRS page lists of already scanned PDFs, keyed by the SHA-1 of the file
+CACHE_DIR = ".cache"
+
+# part of the cache key; bump whenever esrs_pages_in or pdf_mentions_esrs
+# change how pages are detected, so page lists from the old rule are not reused
+SCAN_VERSION = 1
+
+# skip the page scan for PDFs in which pdfium finds no "ESRS" at all
+SKIP_PDFS_WITHOUT_ESRS = True
+
+# upper bound on worker processes per PDF
+MAX_WORKERS = min(os.cpu_count() or 1, 8)
+
+def map_in_workers(fn, tasks):
+    """Map fn over tasks in a pool of MAX_WORKERS processes, or inline with one."""
+    if MAX_WORKERS <= 1 or len(tasks) <= 1:
+        return list(map(fn, tasks))
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return list(executor.map(fn, tasks))
+
+def esrs_pages_in(pdf, start, stop):
+    """Return the pages (1-based) in [start, stop) of an open pdfplumber PDF
+    whose text contains 'ESRS'. Bump SCAN_VERSION when changing the test."""
     pages = []
+    for i in range(start, stop):
+        page = pdf.pages[i - 1]
+        # test the raw character stream, skipping pdfplumber's line and
+        # word reconstruction
+        text = "".join(c["text"] for c in page.chars)
+        found = bool(text) and ESRS_MENTION_RE.search(text) is not None
+        # drop the parsed layout so memory stays bounded
+        page.close()
+        if found:
+            pages.append(i)
+    return pages
+
+def find_esrs_pages_in_range(pdf_path, start, stop):
+    """Return the pages (1-based) in [start, stop) whose text contains 'ESRS'.
+
+    Opens its own pdfplumber handle: pages of one document share a pdfminer
+    parser, which is not safe to use from several threads at once.
+    """
     with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages, start=1):
-            text = (page.extract_text() or "").upper()
-            if "ESRS" in text:
-                pages.append(i)
+        return esrs_pages_in(pdf, start, stop)
+
+def _find_esrs_pages_task(args):
+    return find_esrs_pages_in_range(*args)
+
+def pdf_mentions_esrs(pdf_path):
+    """Quick check, with pdfium's text layer, whether any page mentions 'ESRS'.
+
+    Stops at the first page that does, so it is cheap for ESRS reports and
+    still far faster than the pdfplumber scan for the rest.
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        for page in pdf:
+            textpage = page.get_textpage()
+            text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+            if ESRS_MENTION_RE.search(text):
+                return True
+        return False
+    finally:
+        pdf.close()
+
+def file_sha1(path):
+    """SHA-1 hex digest of a file's contents, read in 1 MiB chunks."""
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def find_esrs_pages    (pdf_path):
+    """Return list of pages (1-based) whose text contains 'ESRS'.
+
+    The result is cached in CACHE_DIR, so a PDF that was scanned before is
+    not parsed again. With SKIP_PDFS_WITHOUT_ESRS, a PDF in which pdfium finds
+    no mention at all returns [] without the pdfplumber scan; that result is
+    not cached, so turning the flag off still gets the full scan.
+    """
+    cache_path = os.path.join(CACHE_DIR, f"{SCAN_VERSION}-{file_sha1(pdf_path)}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path) as fh:
+            return json.load(fh)
+
+    if SKIP_PDFS_WITHOUT_ESRS and not pdf_mentions_esrs(pdf_path):
+        print("  → no page mentions ESRS, skipped")
+        return []
+
+    pages = scan_esrs_pages(pdf_path)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # write then rename, so a parallel run never reads a half-written file
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(pages, fh)
+    os.replace(tmp_path, cache_path)
     return pages
 
-def extract_tables_on_page(pdf_path, page, flavor):
-    """Pull tables from a single page with Camelot flavor."""
+def scan_esrs_pages(pdf_path):
+    """Parse the PDF and return the pages (1-based) whose text contains 'ESRS'."""
+    with pdfplumber.open(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+        if MAX_WORKERS <= 1:
+            # scanning inline, so reuse the handle opened for the page count
+            return esrs_pages_in(pdf, 1, n_pages + 1)
+    # scan contiguous page ranges in parallel, one per worker
+    size = -(-n_pages // MAX_WORKERS) or 1
+    ranges = [(pdf_path, start, min(start + size, n_pages + 1))
+              for start in range(1, n_pages + 1, size)]
+    return [page for pages in map_in_workers(_find_esrs_pages_task, ranges) for page in pages]
+
+def read_mupdf_tables(pdf_path, pages):
+    """Pull ruled tables from the given pages with PyMuPDF's table finder.
+
+    Runs in a worker process, so it returns ("pymupdf", triples), where each
+    triple is a picklable (page, DataFrame, codes); empty cells come back as
+    "" like Camelot's.
+    """
+    found = []
     try:
-        return camelot.read_pdf(pdf_path,
-                                pages=str(page),
-                                flavor=flavor,
-                                strip_text='\n')
+        doc = fitz.open(pdf_path)
     except Exception as e:
-        print(f"  → Camelot {flavor} failed on page {page}: {e}")
-        return []
+        print(f"  → PyMuPDF failed to open {pdf_path}: {e}")
+        return "pymupdf", found
+    with doc:
+        for page_no in pages:
+            # a page that fails here has no tables with codes, so it falls
+            # back to Camelot stream like any other
+            try:
+                # the default "lines" strategy covers what Camelot's lattice flavor did
+                page_tables = [tab.extract() for tab in doc[page_no - 1].find_tables().tables]
+            except Exception as e:
+                print(f"  → PyMuPDF find_tables failed on page {page_no}: {e}")
+                continue
+            for rows in page_tables:
+                df = pd.DataFrame([[cell or "" for cell in row] for row in rows])
+                found.append((page_no, df, table_codes(df)))
+    return "pymupdf", found
+
+def _read_mupdf_tables_task(args):
+    return read_mupdf_tables(*args)
+
+def read_tables(pdf_path, pages, flavor):
+    """Pull tables from the given pages in one Camelot call.
+
+    Runs in a worker process, so it returns (flavor, triples), where each
+    triple is a picklable (page, DataFrame, codes) rather than a Camelot
+    Table object.
+    """
+    try:
+        tables = camelot.read_pdf(pdf_path,
+                                  pages=",".join(map(str, pages)),
+                                  flavor=flavor,
+                                  strip_text='\n')
+    except Exception as e:
+        print(f"  → Camelot {flavor} failed on pages {pages}: {e}")
+        return flavor, []
+    # Camelot reports the page number as a string
+    return flavor, [(int(tbl.page), tbl.df, table_codes(tbl.df)) for tbl in tables]
+
+def _read_tables_task(args):
+    return read_tables(*args)
 
 def extract_esrs_tables(pdf_path, output_csv="esrs_tables.csv"):
     esrs_pages = find_esrs_pages(pdf_path)
@@ -33,51 +202,90 @@ def extract_esrs_tables(pdf_path, output_csv="esrs_tables.csv"):
 
     all_dfs = []
 
+    # split the pages into one batch per worker, so every worker parses the
+    # PDF once for a whole batch instead of once per page; with a single
+    # worker that is one call per extractor covering every page
+    def batches(pages):
+        size = -(-len(pages) // MAX_WORKERS) or 1
+        return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+    # ruled tables come from PyMuPDF; Camelot's stream flavor only runs on
+    # the pages where none of them has a code (e.g. only shaded heading boxes)
+    tables_by_page = defaultdict(list)
+    tasks = [(pdf_path, batch) for batch in batches(esrs_pages)]
+    for flavor, tables in map_in_workers(_read_mupdf_tables_task, tasks):
+        for page, df, codes in tables:
+            tables_by_page[page, flavor].append((df, codes))
+
+    fallback_pages = [page for page in esrs_pages
+                      if not any(codes for _, codes in tables_by_page.get((page, "pymupdf"), []))]
+    tasks = [(pdf_path, batch, "stream") for batch in batches(fallback_pages)]
+    for flavor, tables in map_in_workers(_read_tables_task, tasks):
+        for page, df, codes in tables:
+            tables_by_page[page, flavor].append((df, codes))
+
     for page in esrs_pages:
-        for flavor in ("lattice", "stream"):
-            tables = extract_tables_on_page(pdf_path, page, flavor)
+        for flavor in ("pymupdf", "stream"):
+            # pop, so raw tables are released once they have been processed
+            tables = tables_by_page.pop((page, flavor), [])
             if not tables:
                 continue
 
             print(f"Found {len(tables)} tables on page {page} via {flavor}")
-            for idx, tbl in enumerate(tables, start=1):
-                df = tbl.df.copy()
-                # normalize whitespace
-                df = df.applymap(lambda x: re.sub(r"\s+", " ", x.strip()))
-
-                # flatten all cells into one big string to search for codes
-                body_text = " ".join(df.iloc[:, :].values.flatten().tolist())
-                codes = ESRS_CODE_RE.findall(body_text)
-                if codes:
-                    print(f"  → Table #{idx} on p.{page} has codes: {sorted(set(codes))}")
-                    # assume first row is header if it mentions Disclosure
-                    header = df.iloc[0].tolist()
-                    if any("DISCLOSURE" in h.upper() for h in header):
-                        df.columns = df.iloc[0]
-                        df = df.drop(0)
-                    df["__source_page"] = page
-                    all_dfs.append(df)
-                else:
+            for idx, (df, codes) in enumerate(tables, start=1):
+                # codes were found by the worker on the raw cells, so tables
+                # without codes skip the normalization below
+                if not codes:
                     print(f"  → Table #{idx} on p.{page} has NO ESRS codes.")
+                    continue
+
+                print(f"  → Table #{idx} on p.{page} has codes: {codes}")
+                # normalize whitespace, one vectorized column at a time; apply
+                # returns a new frame, so the raw table needs no copy first
+                df = df.apply(lambda col: col.astype(str).str.strip().str.replace(WHITESPACE_RE, " ", regex=True))
+
+                # assume first row is header if it mentions Disclosure
+                header = df.iloc[0].tolist()
+                if any("DISCLOSURE" in h.upper() for h in header):
+                    df.columns = df.iloc[0]
+                    df = df.drop(0)
+                df["__source_page"] = page
+                # plain string labels, so equal headers share a CSV column
+                df.columns = [str(c) for c in df.columns]
+                all_dfs.append(df)
 
     if not all_dfs:
         print("⛔ No ESRS tables extracted.")
         return None
 
-    result = pd.concat(all_dfs, ignore_index=True)
+    result = pd.concat(all_dfs, ignore_index=True, sort=False)
     result.to_csv(output_csv, index=False)
     print(f"✅ Extracted {len(result)} rows into {output_csv!r}")
-    return result
+    return len(result)
+
+def init_pdf_worker(max_workers):
+    """Set the per-PDF worker count in a process that handles whole PDFs."""
+    global MAX_WORKERS
+    MAX_WORKERS = max_workers
 
-import glob, os
+def process_one_pdf(pdf_file):
+    print("── processing", pdf_file)
+    n_rows = extract_esrs_tables(pdf_file, output_csv=os.path.basename(pdf_file).replace(".pdf", ".csv"))
+    if n_rows is not None:
+        print("  → saved", n_rows, "rows to CSV\n")
 
 def main():
     pdf_files = glob.glob(os.path.join("pdfs", "*.pdf"))
-    for pdf_file in pdf_files:
-        print("── processing", pdf_file)
-        df = extract_esrs_tables(pdf_file, output_csv=os.path.basename(pdf_file).replace(".pdf", ".csv"))
-        if df is not None:
-            print("  → saved", df.shape, "to CSV\n")
+    if not pdf_files:
+        return
+    # one worker per PDF, each writing its own CSV; cores left over when there
+    # are fewer PDFs than cores go to the per-PDF page and table pools
+    cpu_count = os.cpu_count() or 1
+    inner_workers = min(max(1, cpu_count // len(pdf_files)), 8)
+    with ProcessPoolExecutor(max_workers=min(cpu_count, len(pdf_files)),
+                             initializer=init_pdf_worker,
+                             initargs=(inner_workers,)) as executor:
+        list(executor.map(process_one_pdf, pdf_files))
 
 if __name__ == "__main__":
     main()